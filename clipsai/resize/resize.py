@@ -53,7 +53,8 @@ def resize(
         If set to True, post-processing is applied to the face detection output to make
         it appear more natural.
     n_face_detect_batches: int
-        Number of batches for processing face detection when using GPUs.
+        Minimum number of batches for processing face detection when using GPUs.
+        More batches are used if the frames don't fit in the free GPU memory.
     min_scene_duration: float
         Minimum duration in seconds for a scene to be considered during scene detection.
     scene_merge_threshold: float
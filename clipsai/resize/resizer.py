@@ -6,7 +6,13 @@ Notes
 - ROI is "region of interest"
 """
 # standard library imports
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import gc
+from itertools import chain
 import logging
+import os
+import threading
 
 # current package imports
 from .crops import Crops
@@ -14,7 +20,8 @@ from .exceptions import ResizerError
 from .img_proc import calc_img_bytes
 from .rect import Rect
 from .segment import Segment
-from .vid_proc import extract_frames
+from .segment_analysis import SegmentAnalysis
+from .vid_proc import extract_frames_in_batches
 
 # local package imports
 from clipsai.media.editor import MediaEditor
@@ -27,9 +34,53 @@ import cv2
 from facenet_pytorch import MTCNN
 import mediapipe as mp
 import numpy as np
-from sklearn.cluster import KMeans
+from scipy.sparse.csgraph import connected_components
 import torch
 
+# bytes of GPU memory MTCNN uses per byte of uint8 frames it detects faces in. It
+# makes a float32 copy of the whole batch (4x), then resamples and normalizes it for
+# each scale of its image pyramid, and P-Net's first feature maps have 10 channels
+FACE_DETECT_GPU_MEMORY_FACTOR = 20
+# fraction of the free GPU memory face detection may use, leaving a margin for
+# fragmentation and the rest of the process
+FACE_DETECT_GPU_MEMORY_FRACTION = 0.8
+# maximum number of frames to keep face detections cached for
+FACE_DETECTION_CACHE_SIZE = 50000
+# maximum number of faces to keep mouth aspect ratios cached for. Mouth aspect ratios
+# are only calculated in frames with several faces, and a rerun visits the faces in
+# the same order as the first pass, so the cache covers every face of the frames whose
+# detections are cached rather than evicting each face right before it is reused
+MOUTH_ASPECT_RATIO_CACHE_FACES_PER_FRAME = 2
+MOUTH_ASPECT_RATIO_CACHE_SIZE = (
+    FACE_DETECTION_CACHE_SIZE * MOUTH_ASPECT_RATIO_CACHE_FACES_PER_FRAME
+)
+# minimum width and height in pixels of a face to calculate its mouth aspect ratio
+MIN_MOUTH_FACE_SIZE = 40
+# number of threads calculating the mouth movement of different faces at once
+MOUTH_MOVEMENT_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+# (height, width) of the inputs used to trace each of MTCNN's networks. P-Net is fully
+# convolutional so any image size works and it is traced on its smallest input to keep
+# initialization fast, while R-Net and O-Net take fixed size crops
+FACE_DETECTOR_TRACE_SIZES = {"pnet": (12, 12), "rnet": (24, 24), "onet": (48, 48)}
+# settings of the face detector only used to find the first face of each segment. It
+# skips faces smaller than MTCNN's default of 20 pixels and discards unlikely faces
+# earlier, so fewer candidate boxes reach R-Net and O-Net
+FAST_FACE_DETECT_MIN_FACE_SIZE = 40
+FAST_FACE_DETECT_THRESHOLDS = [0.7, 0.8, 0.8]
+# face mesh landmarks of the inner lip, each upper lip landmark is paired with the lower
+# lip landmark at the same position, and of the corners of the mouth
+UPPER_LIP_LANDMARKS = np.array(
+    [95, 88, 178, 87, 14, 317, 402, 318, 324], dtype=np.int32
+)
+LOWER_LIP_LANDMARKS = np.array(
+    [191, 80, 81, 82, 13, 312, 311, 310, 415], dtype=np.int32
+)
+MOUTH_CORNER_LANDMARKS = np.array([308, 78], dtype=np.int32)
+# all the landmarks the mouth aspect ratio is calculated from, in the order above
+MOUTH_LANDMARKS = np.concatenate(
+    [UPPER_LIP_LANDMARKS, LOWER_LIP_LANDMARKS, MOUTH_CORNER_LANDMARKS]
+).tolist()
+
 
 class Resizer:
     """
@@ -72,10 +123,68 @@ class Resizer:
             post_process=face_detect_post_process,
             device=device,
         )
-        # media pipe automatically uses gpu if available
-        self._face_mesher = mp.solutions.face_mesh.FaceMesh()
+        self._trace_face_detector(device)
+        self._fast_face_detector = MTCNN(
+            margin=face_detect_margin,
+            min_face_size=FAST_FACE_DETECT_MIN_FACE_SIZE,
+            thresholds=FAST_FACE_DETECT_THRESHOLDS,
+            post_process=face_detect_post_process,
+            device=device,
+        )
+        # share the traced networks instead of holding a second copy of the weights
+        for name in FACE_DETECTOR_TRACE_SIZES:
+            setattr(self._fast_face_detector, name, getattr(self._face_detector, name))
+        # face detections of each frame, reused when frames are analyzed again
+        self._face_detection_cache = OrderedDict()
+        # mouth aspect ratio of each face, keyed by its frame and bounding box
+        self._mouth_aspect_ratio_cache = OrderedDict()
+        self._mouth_aspect_ratio_cache_lock = threading.Lock()
+        # pinned host buffer the resized frames of each batch of the segment analysis
+        # are copied to the GPU from, only held while the segments are analyzed
+        self._pinned_frame_buffer = None
+        # created on first use, only segments with several faces need them. Media
+        # pipe graphs aren't thread safe so each worker thread has its own mesher
+        self._mouth_movement_executor = None
+        self._face_mesher_local = threading.local()
+        # every face mesher created by any thread, so they can all be closed
+        self._face_meshers = []
+        self._face_meshers_lock = threading.Lock()
         self._media_editor = MediaEditor()
 
+    def _trace_face_detector(self, device: str) -> None:
+        """
+        Replaces MTCNN's networks with TorchScript traces of themselves so every
+        forward pass skips the python module overhead. On CPU the networks are first
+        converted to the channels last memory format, which lets PyTorch dispatch
+        the convolutions and poolings to its oneDNN kernels. Falls back to the
+        untraced networks if tracing fails.
+
+        Parameters
+        ----------
+        device: str
+            PyTorch device the face detector runs on.
+
+        Returns
+        -------
+        None
+        """
+        traced_nets = {}
+        try:
+            for name, (height, width) in FACE_DETECTOR_TRACE_SIZES.items():
+                net = getattr(self._face_detector, name).eval()
+                example_input = torch.randn(1, 3, height, width, device=device)
+                if device == "cpu":
+                    net = net.to(memory_format=torch.channels_last)
+                    example_input = example_input.to(memory_format=torch.channels_last)
+                with torch.no_grad():
+                    traced_nets[name] = torch.jit.trace(net, example_input)
+        except Exception as e:
+            logging.debug("Failed to trace face detector networks: {}".format(e))
+            return
+
+        for name, traced_net in traced_nets.items():
+            setattr(self._face_detector, name, traced_net)
+
     def resize(
         self,
         video_file: VideoFile,
@@ -112,7 +221,8 @@ class Resizer:
         face_detect_width: int
             The width to use for face detection
         n_face_detect_batches: int
-            Number of batches for GPU face detection in a video file
+            Minimum number of batches for GPU face detection in a video file. More
+            batches are used if the frames don't fit in the free GPU memory.
         scene_merge_threshold: float
             The threshold in seconds for merging scene changes with speaker segments.
             Scene changes within this threshold of a segment's start or end time will
@@ -144,6 +254,14 @@ class Resizer:
             speaker_segments, scene_changes, scene_merge_threshold
         )
         logging.debug("Video has {} distinct segments.".format(len(segments)))
+        segments = [
+            SegmentAnalysis(
+                speakers=segment["speakers"],
+                start_time=segment["start_time"],
+                end_time=segment["end_time"],
+            )
+            for segment in segments
+        ]
 
         logging.debug("Determining the first second with a face for each segment.")
         segments = self._find_first_sec_with_face_for_each_segment(
@@ -273,94 +391,94 @@ class Resizer:
             end_time: float
                 end time of the segment in seconds
         """
-        segments_idx = 0
-        for scene_change_sec in scene_changes:
-            segment = speaker_segments[segments_idx]
-            while scene_change_sec > (segment["end_time"]):
-                segments_idx += 1
-                segment = speaker_segments[segments_idx]
+        if len(scene_changes) == 0:
+            return speaker_segments
+
+        # index of the first speaker segment ending at or after each scene change
+        end_times = np.fromiter(
+            (segment["end_time"] for segment in speaker_segments),
+            dtype=np.float64,
+            count=len(speaker_segments),
+        )
+        end_time_idxs = np.searchsorted(end_times, scene_changes, side="left")
+
+        # segments before the current segment
+        updated_speaker_segments = []
+        segment = speaker_segments[0]
+        # segment split off from the current segment by the last scene change
+        split_segment = None
+        # index of the next speaker segment that hasn't been visited
+        next_idx = 1
+        for scene_change_sec, end_time_idx in zip(scene_changes, end_time_idxs):
+            # move to the segment containing the scene change
+            if scene_change_sec > segment["end_time"] and split_segment is not None:
+                updated_speaker_segments.append(segment)
+                segment = split_segment
+                split_segment = None
+            if scene_change_sec > segment["end_time"]:
+                segment_idx = max(next_idx, int(end_time_idx))
+                updated_speaker_segments.append(segment)
+                updated_speaker_segments.extend(speaker_segments[next_idx:segment_idx])
+                segment = speaker_segments[segment_idx]
+                next_idx = segment_idx + 1
             # scene change is close to speaker segment end -> merge the two
             if 0 < (segment["end_time"] - scene_change_sec) < scene_merge_threshold:
                 segment["end_time"] = scene_change_sec
-                if segments_idx == len(speaker_segments) - 1:
-                    continue
-                next_segment = speaker_segments[segments_idx + 1]
-                next_segment["start_time"] = scene_change_sec
+                if split_segment is not None:
+                    split_segment["start_time"] = scene_change_sec
+                elif next_idx < len(speaker_segments):
+                    speaker_segments[next_idx]["start_time"] = scene_change_sec
                 continue
             # scene change is close to speaker segment start -> merge the two
             if 0 < (scene_change_sec - segment["start_time"]) < scene_merge_threshold:
                 segment["start_time"] = scene_change_sec
-                if segments_idx == 0:
-                    continue
-                prev_segment = speaker_segments[segments_idx - 1]
-                prev_segment["end_time"] = scene_change_sec
+                if len(updated_speaker_segments) > 0:
+                    updated_speaker_segments[-1]["end_time"] = scene_change_sec
                 continue
             # scene change already exists
             if scene_change_sec == segment["end_time"]:
                 continue
             # add scene change to segments
-            new_segment = {
+            split_segment = {
                 "start_time": scene_change_sec,
                 "speakers": segment["speakers"],
                 "end_time": segment["end_time"],
             }
             segment["end_time"] = scene_change_sec
-            speaker_segments = (
-                speaker_segments[: segments_idx + 1]
-                + [new_segment]
-                + speaker_segments[segments_idx + 1 :]
-            )
 
-        return speaker_segments
+        updated_speaker_segments.append(segment)
+        if split_segment is not None:
+            updated_speaker_segments.append(split_segment)
+        updated_speaker_segments.extend(speaker_segments[next_idx:])
+
+        return updated_speaker_segments
 
     def _find_first_sec_with_face_for_each_segment(
         self,
-        segments: list[dict],
+        segments: list[SegmentAnalysis],
         video_file: VideoFile,
         face_detect_width: int,
         n_face_detect_batches: int,
-    ) -> list[dict]:
+    ) -> list[SegmentAnalysis]:
         """
         Find the first frame in a segment with a face.
 
         Parameters
         ----------
-        segments: list[dict]
-            List of speaker segments (dictionaries), each with the following keys
-                speakers: list[int]
-                    list of speaker numbers for the speakers talking in the segment
-                start_time: float
-                    start time of the segment in seconds
-                end_time: float
-                    end time of the segment in seconds
+        segments: list[SegmentAnalysis]
+            The segments to search for faces.
         video_file: VideoFile
             The video file to analyze.
         n_face_detect_batches: int
-            The number of batches to use for identifyinng faces from a video file
+            The minimum number of batches to use for identifyinng faces from a video
+            file. More batches are used if the frames don't fit in the free GPU
+            memory.
 
         Returns
         -------
-        list[dict]
-            List of speaker segments (dictionaries), each with the following keys
-                speakers: list[int]
-                    list of speaker numbers for the speakers talking in the segment
-                start_time: float
-                    start time of the segment in seconds
-                end_time: float
-                    end time of the segment in seconds
-                first_face_sec: float
-                    the first second in the segment with a face
-                found_face: bool
-                    whether or not a face was found in the segment
+        list[SegmentAnalysis]
+            The segments with first_face_sec and found_face updated.
         """
-        for segment in segments:
-            start_time = segment["start_time"]
-            end_time = segment["end_time"]
-            # start looking for faces an eighth of the way through the segment
-            segment["first_face_sec"] = start_time + (end_time - start_time) / 8
-            segment["found_face"] = False
-            segment["is_analyzed"] = False
-
         batch_period = 1  # interval length to sample each segment at each iteration
         sample_period = 1  # interval between consecutive samples
         analyzed_segments = 0
@@ -368,68 +486,85 @@ class Resizer:
             # select times to detect faces from
             detect_secs = []
             for segment in segments:
-                if segment["is_analyzed"] is True:
+                if segment.is_analyzed is True:
                     continue
-                segment_secs_left = segment["end_time"] - segment["first_face_sec"]
+                segment_secs_left = segment.end_time - segment.first_face_sec
                 num_samples = min(batch_period, segment_secs_left) // sample_period
                 num_samples = max(1, int(num_samples))
-                segment["num_samples"] = num_samples
+                segment.num_samples = num_samples
                 for i in range(num_samples):
-                    detect_secs.append(segment["first_face_sec"] + i * sample_period)
+                    detect_secs.append(segment.first_face_sec + i * sample_period)
 
-            # detect faces
+            # detect faces, only extracting the frames without cached detections
+            cache_keys = self._calc_face_detection_cache_keys(
+                video_file, detect_secs, face_detect_width, fast=True
+            )
+            face_detections, uncached_idxs = self._get_cached_face_detections(
+                cache_keys
+            )
+            uncached_secs = [detect_secs[i] for i in uncached_idxs]
             n_batches = self._calc_n_batches(
                 video_file=video_file,
-                num_frames=len(detect_secs),
+                num_frames=len(uncached_secs),
                 face_detect_width=face_detect_width,
                 n_face_detect_batches=n_face_detect_batches,
             )
-            frames_per_batch = int(len(detect_secs) // n_batches + 1)
-            face_detections = []
-            for i in range(n_batches):
-                frames = extract_frames(
-                    video_file,
-                    detect_secs[
-                        i
-                        * frames_per_batch : min(
-                            (i + 1) * frames_per_batch, len(detect_secs)
-                        )
-                    ],
+            frames_per_batch = int(len(uncached_secs) // n_batches + 1)
+            detect_secs_batches = [
+                uncached_secs[
+                    i
+                    * frames_per_batch : min(
+                        (i + 1) * frames_per_batch, len(uncached_secs)
+                    )
+                ]
+                for i in range(n_batches)
+            ]
+            uncached_detections = [None] * len(uncached_secs)
+            batch_start = 0
+            for frames in extract_frames_in_batches(video_file, detect_secs_batches):
+                batch_end = batch_start + len(frames)
+                uncached_detections[batch_start:batch_end] = self._detect_faces(
+                    frames, face_detect_width, fast=True
                 )
-                face_detections += self._detect_faces(frames, face_detect_width)
+                batch_start = batch_end
+            for i, face_detection in zip(uncached_idxs, uncached_detections):
+                face_detections[i] = face_detection
+            self._cache_face_detections(
+                [cache_keys[i] for i in uncached_idxs], uncached_detections
+            )
 
             # check if any faces were found for each segment
+            has_face = np.fromiter(
+                (faces is not None for faces in face_detections),
+                dtype=bool,
+                count=len(face_detections),
+            )
             idx = 0
             for segment in segments:
                 # segment already analyzed
-                if segment["is_analyzed"] is True:
+                if segment.is_analyzed is True:
                     continue
-                segment_idx = idx
                 # check if any faces were found
-                for _ in range(segment["num_samples"]):
-                    faces = face_detections[idx]
-                    if faces is not None:
-                        segment["found_face"] = True
-                        break
-                    segment["first_face_sec"] += sample_period
-                    idx += 1
+                segment_has_face = has_face[idx : idx + segment.num_samples]
+                first_face_idx = int(np.argmax(segment_has_face))
+                if segment_has_face[first_face_idx]:
+                    segment.found_face = True
+                    segment.first_face_sec += first_face_idx * sample_period
+                else:
+                    segment.first_face_sec += segment.num_samples * sample_period
                 # update segment analyzation status
                 is_analyzed = (
-                    segment["found_face"] is True
-                    or segment["first_face_sec"] >= segment["end_time"] - 0.25
+                    segment.found_face is True
+                    or segment.first_face_sec >= segment.end_time - 0.25
                 )
                 if is_analyzed:
-                    segment["is_analyzed"] = True
+                    segment.is_analyzed = True
                     analyzed_segments += 1
-                idx = segment_idx + segment["num_samples"]
+                idx += segment.num_samples
 
             # increase period for next iteration
             batch_period = (batch_period + 3) * 2
 
-        for segment in segments:
-            del segment["num_samples"]
-            del segment["is_analyzed"]
-
         return segments
 
     def _calc_n_batches(
@@ -452,7 +587,9 @@ class Resizer:
         face_detect_width: int
             The width to use for face detection.
         n_face_detect_batches: int
-            Number of batches for GPU face detection in a video file.
+            Minimum number of batches for GPU face detection in a video file. More
+            batches are used if the memory face detection needs doesn't fit in the
+            free GPU memory.
 
         Returns
         -------
@@ -489,13 +626,24 @@ class Resizer:
             )
         )
 
-        # calculate number of batches to use
-        free_cpu_memory = pytorch.get_free_cpu_memory()
+        # calculate number of batches to use; the next batch of frames is extracted
+        # while the current one is analyzed, so two batches share the CPU memory
+        free_cpu_memory = pytorch.get_free_cpu_memory() // 2
+        # the resized frames are held on the CPU too, in pinned memory when using GPU
+        total_extract_bytes += total_face_detect_bytes
+        n_extract_batches = int((total_extract_bytes // free_cpu_memory) + 1)
         if torch.cuda.is_available():
-            n_extract_batches = int((total_extract_bytes // free_cpu_memory) + 1)
+            face_detect_gpu_bytes = (
+                FACE_DETECT_GPU_MEMORY_FACTOR * total_face_detect_bytes
+            )
+            free_gpu_memory = max(
+                int(pytorch.get_free_gpu_memory() * FACE_DETECT_GPU_MEMORY_FRACTION), 1
+            )
+            n_face_detect_batches = max(
+                n_face_detect_batches,
+                int((face_detect_gpu_bytes // free_gpu_memory) + 1),
+            )
         else:
-            total_extract_bytes += total_face_detect_bytes
-            n_extract_batches = int((total_extract_bytes // free_cpu_memory) + 1)
             n_face_detect_batches = 0
 
         n_batches = int(max(n_extract_batches, n_face_detect_batches))
@@ -503,7 +651,7 @@ class Resizer:
         if n_face_detect_batches == 0:
             gpu_mem_per_batch = 0
         else:
-            gpu_mem_per_batch = bytes_to_gibibytes(total_face_detect_bytes // n_batches)
+            gpu_mem_per_batch = bytes_to_gibibytes(face_detect_gpu_bytes // n_batches)
         logging.debug(
             "Using {} batches to extract and detect frames. Need {:.3f} GiB of CPU "
             "memory per batch and {:.3f} GiB of GPU memory per batch".format(
@@ -518,6 +666,7 @@ class Resizer:
         self,
         frames: list[np.ndarray],
         face_detect_width: int,
+        fast: bool = False,
     ) -> list[np.ndarray]:
         """
         Detect faces in a list of frames.
@@ -528,6 +677,9 @@ class Resizer:
             The frames to detect faces in.
         face_detect_width: int
             The width to use for face detection.
+        fast: bool
+            Whether to use the fast face detector, which misses small and unclear
+            faces. Good enough to tell whether a frame has a face.
 
         Returns
         -------
@@ -538,38 +690,209 @@ class Resizer:
             logging.debug("No frames to detect faces in.")
             return []
 
-        # resize the frames
+        # resize the frames directly into a single (N, H, W, 3) batch
         logging.debug("Detecting faces in {} frames.".format(len(frames)))
         downsample_factor = max(frames[0].shape[1] / face_detect_width, 1)
         detect_height = int(frames[0].shape[0] / downsample_factor)
-        resized_frames = []
-        for frame in frames:
-            resized_frame = cv2.resize(frame, (face_detect_width, detect_height))
-            if torch.cuda.is_available():
-                resized_frame = torch.from_numpy(resized_frame).to(
-                    device="cuda", dtype=torch.uint8
-                )
-            resized_frames.append(resized_frame)
-
-        # detect faces in batches
-        if torch.cuda.is_available():
-            resized_frames = torch.stack(resized_frames)
-        detections, _ = self._face_detector.detect(resized_frames)
-
-        # detections are returned as numpy arrays regardless
-        face_detections = []
-        for detection in detections:
-            if detection is not None:
-                detection[detection < 0] = 0
-                detection = (detection * downsample_factor).astype(np.int16)
-            face_detections.append(detection)
+        batch_shape = (len(frames), detect_height, face_detect_width, 3)
+        # resize into pinned memory if the batch fits so it's copied to the GPU
+        # asynchronously
+        pinned_frames = self._get_pinned_frame_buffer(batch_shape)
+        if pinned_frames is not None:
+            resized_frames = pinned_frames.numpy()
+        else:
+            resized_frames = np.empty(batch_shape, dtype=np.uint8)
+        for i, frame in enumerate(frames):
+            cv2.resize(frame, (face_detect_width, detect_height), dst=resized_frames[i])
+        # copy the resized batch to the GPU once rather than the full size frames. The
+        # detections are read back on the host, so the copy has finished before the
+        # pinned buffer is reused
+        if pinned_frames is not None:
+            resized_frames = pinned_frames.to(device="cuda", non_blocking=True)
+        elif torch.cuda.is_available():
+            resized_frames = torch.from_numpy(resized_frames).to(device="cuda")
+
+        # detect faces in a single forward pass, in half precision on the GPU
+        with torch.inference_mode(), torch.autocast(
+            "cuda", dtype=torch.float16, enabled=torch.cuda.is_available()
+        ):
+            face_detector = self._fast_face_detector if fast else self._face_detector
+            detections, _ = face_detector.detect(resized_frames)
+
+        # detections are returned as numpy arrays regardless; frames without a face
+        # have a detection of None
+        face_detections = [None] * len(detections)
+        detected_idxs = [
+            i for i, detection in enumerate(detections) if detection is not None
+        ]
+        if len(detected_idxs) > 0:
+            # scale the bounding boxes of all frames back to the original frame size
+            # at once, then split them back up by frame
+            boxes = np.concatenate(
+                [detections[i] for i in detected_idxs], dtype=np.float32
+            )
+            np.clip(boxes, 0, None, out=boxes)
+            boxes = (boxes * downsample_factor).astype(np.int16)
+            n_boxes = [len(detections[i]) for i in detected_idxs]
+            for i, frame_boxes in zip(
+                detected_idxs, np.split(boxes, np.cumsum(n_boxes)[:-1])
+            ):
+                face_detections[i] = frame_boxes
 
         logging.debug("Detected faces in {} frames.".format(len(face_detections)))
         return face_detections
 
+    def _calc_face_detection_cache_keys(
+        self,
+        video_file: VideoFile,
+        detect_secs: list[float],
+        face_detect_width: int,
+        fast: bool = False,
+    ) -> list[tuple]:
+        """
+        Calculate the keys to cache the face detections of frames from a video file
+        with. The video file is identified by its path, modification time and size so
+        that the cached detections are dropped if the file changes.
+
+        Parameters
+        ----------
+        video_file: VideoFile
+            The video file the frames are from.
+        detect_secs: list[float]
+            The seconds of the frames.
+        face_detect_width: int
+            The width used for face detection.
+        fast: bool
+            Whether the fast face detector is used.
+
+        Returns
+        -------
+        list[tuple]
+            The cache key of each frame.
+        """
+        file_stats = os.stat(video_file.path)
+        video_key = (video_file.path, file_stats.st_mtime_ns, file_stats.st_size)
+        return [
+            (video_key, detect_sec, face_detect_width, fast)
+            for detect_sec in detect_secs
+        ]
+
+    def _get_cached_face_detections(
+        self,
+        cache_keys: list[tuple],
+    ) -> tuple[list[np.ndarray], list[int]]:
+        """
+        Look up the cached face detections of a list of frames.
+
+        Parameters
+        ----------
+        cache_keys: list[tuple]
+            The cache key of each frame.
+
+        Returns
+        -------
+        tuple[list[np.ndarray], list[int]]
+            The cached face detections of each frame (None for frames that aren't
+            cached) and the indices of the frames that aren't cached.
+        """
+        face_detections = [None] * len(cache_keys)
+        uncached_idxs = []
+        for i, cache_key in enumerate(cache_keys):
+            if cache_key in self._face_detection_cache:
+                self._face_detection_cache.move_to_end(cache_key)
+                face_detections[i] = self._face_detection_cache[cache_key]
+            else:
+                uncached_idxs.append(i)
+        return face_detections, uncached_idxs
+
+    def _cache_face_detections(
+        self,
+        cache_keys: list[tuple],
+        face_detections: list[np.ndarray],
+    ) -> None:
+        """
+        Cache the face detections of a list of frames, evicting the least recently
+        used detections once the cache is full.
+
+        Parameters
+        ----------
+        cache_keys: list[tuple]
+            The cache key of each frame.
+        face_detections: list[np.ndarray]
+            The face detections of each frame.
+
+        Returns
+        -------
+        None
+        """
+        for cache_key, face_detection in zip(cache_keys, face_detections):
+            self._face_detection_cache[cache_key] = face_detection
+        while len(self._face_detection_cache) > FACE_DETECTION_CACHE_SIZE:
+            self._face_detection_cache.popitem(last=False)
+
+    def _allocate_pinned_frame_buffer(
+        self,
+        num_frames: int,
+        video_file: VideoFile,
+        face_detect_width: int,
+    ) -> None:
+        """
+        Allocate the pinned host buffer that the resized frames of a batch are copied
+        to the GPU from. The buffer is allocated once for the largest planned batch
+        instead of growing with each batch. Does nothing if CUDA isn't available.
+
+        Parameters
+        ----------
+        num_frames: int
+            The number of frames of the largest batch.
+        video_file: VideoFile
+            The video file the frames are from.
+        face_detect_width: int
+            The width the frames are resized to for face detection.
+
+        Returns
+        -------
+        None
+        """
+        self._pinned_frame_buffer = None
+        if not torch.cuda.is_available() or num_frames == 0:
+            return
+        downsample_factor = max(video_file.get_width_pixels() / face_detect_width, 1)
+        detect_height = int(video_file.get_height_pixels() / downsample_factor)
+        self._pinned_frame_buffer = torch.empty(
+            (num_frames, detect_height, face_detect_width, 3), dtype=torch.uint8
+        ).pin_memory()
+
+    def _get_pinned_frame_buffer(
+        self,
+        batch_shape: tuple[int, int, int, int],
+    ) -> torch.Tensor:
+        """
+        Get the part of the pinned host buffer that holds a batch of resized frames.
+
+        Parameters
+        ----------
+        batch_shape: tuple[int, int, int, int]
+            The (num_frames, height, width, channels) of the resized frames.
+
+        Returns
+        -------
+        torch.Tensor
+            A pinned uint8 tensor of shape batch_shape. None if no buffer is
+            allocated or the batch doesn't fit in it.
+        """
+        num_frames, *frame_shape = batch_shape
+        if (
+            self._pinned_frame_buffer is None
+            or list(self._pinned_frame_buffer.shape[1:]) != frame_shape
+            or len(self._pinned_frame_buffer) < num_frames
+        ):
+            return None
+        return self._pinned_frame_buffer[:num_frames]
+
     def _add_x_y_coords_to_each_segment(
         self,
-        segments: list[dict],
+        segments: list[SegmentAnalysis],
         video_file: VideoFile,
         resize_width: int,
         resize_height: int,
@@ -582,17 +905,8 @@ class Resizer:
 
         Parameters
         ----------
-        segments: list[dict]
-            speakers: list[int]
-                list of speaker numbers for the speakers talking in the segment
-            start_time: float
-                start time of the segment in seconds
-            end_time: float
-                end time of the segment in seconds
-            first_face_sec: float
-                the first second in the segment with a face
-            found_face: bool
-                whether or not a face was found in the segment
+        segments: list[SegmentAnalysis]
+            The segments, after searching each of them for its first face.
         video_file: VideoFile
             The video file to analyze.
         resize_width: int
@@ -604,7 +918,8 @@ class Resizer:
         face_detect_width: int
             Width to resize the frames to for face detection.
         n_face_detect_batches: int
-            Number of batches to process for face detection.
+            Minimum number of batches to process for face detection. More batches are
+            used if the frames don't fit in the free GPU memory.
 
 
         Returns
@@ -627,9 +942,8 @@ class Resizer:
             video_file, num_frames, face_detect_width, n_face_detect_batches
         )
         segments_per_batch = int(num_segments // n_batches + 1)
-        segments_with_xy_coords = []
+        segment_batches = []
         for i in range(n_batches):
-            logging.debug("Analyzing batch {} of {}.".format(i, n_batches))
             cur_segments = segments[
                 i
                 * segments_per_batch : min((i + 1) * segments_per_batch, len(segments))
@@ -637,23 +951,93 @@ class Resizer:
             if len(cur_segments) == 0:
                 logging.debug("No segments left to analyze. (Batch {})".format(i))
                 break
+            segment_batches.append(cur_segments)
+
+        # define frames to analyze from each batch so they can be extracted ahead of
+        # the batch being analyzed
+        detect_secs_batches = [
+            self._calc_face_detect_secs(cur_segments, video_file, samples_per_segment)
+            for cur_segments in segment_batches
+        ]
+        frame_batches = extract_frames_in_batches(video_file, detect_secs_batches)
+        self._allocate_pinned_frame_buffer(
+            max(map(len, detect_secs_batches), default=0),
+            video_file,
+            face_detect_width,
+        )
+
+        segments_with_xy_coords = []
+        for i, (cur_segments, detect_secs, frames) in enumerate(
+            zip(segment_batches, detect_secs_batches, frame_batches)
+        ):
+            logging.debug("Analyzing batch {} of {}.".format(i, n_batches))
             segments_with_xy_coords += self._add_x_y_coords_to_each_segment_batch(
                 segments=cur_segments,
+                detect_secs=detect_secs,
+                frames=frames,
                 video_file=video_file,
                 resize_width=resize_width,
                 resize_height=resize_height,
-                samples_per_segment=samples_per_segment,
                 face_detect_width=face_detect_width,
             )
+        self._pinned_frame_buffer = None
         return segments_with_xy_coords
 
+    def _calc_face_detect_secs(
+        self,
+        segments: list[SegmentAnalysis],
+        video_file: VideoFile,
+        samples_per_segment: int,
+    ) -> list[float]:
+        """
+        Calculate the seconds to sample frames from for analyzing the face locations
+        of each segment in a batch. The number of samples taken from each segment is
+        stored in its num_samples attribute.
+
+        Parameters
+        ----------
+        segments: list[SegmentAnalysis]
+            The segments of the batch, after searching each of them for its first face.
+        video_file: VideoFile
+            The video file to analyze.
+        samples_per_segment: int
+            Number of samples to take per segment for analyzing face locations.
+
+        Returns
+        -------
+        list[float]
+            The seconds to sample frames from, in order of the segments.
+        """
+        fps = video_file.get_frame_rate()
+
+        detect_secs = []
+        for segment in segments:
+            if segment.found_face is False:
+                continue
+            # define interval over which to analyze faces
+            end_time = segment.end_time
+            first_face_sec = segment.first_face_sec
+            analyze_end_time = end_time - (end_time - first_face_sec) / 8
+            # get sample locations
+            frames_left = int((analyze_end_time - first_face_sec) * fps + 1)
+            num_samples = min(frames_left, samples_per_segment)
+            segment.num_samples = num_samples
+            # add first face, sample the rest evenly spaced after it
+            detect_secs.append(first_face_sec)
+            sample_frames = np.linspace(0, frames_left, num_samples, endpoint=False)
+            for sample_frame in sample_frames[1:].astype(int):
+                detect_secs.append(first_face_sec + sample_frame / fps)
+
+        return detect_secs
+
     def _add_x_y_coords_to_each_segment_batch(
         self,
-        segments: list[dict],
+        segments: list[SegmentAnalysis],
+        detect_secs: list[float],
+        frames: list[np.ndarray],
         video_file: VideoFile,
         resize_width: int,
         resize_height: int,
-        samples_per_segment: int,
         face_detect_width: int,
     ) -> list[dict]:
         """
@@ -661,25 +1045,20 @@ class Resizer:
 
         Parameters
         ----------
-        segments: list[dict]
-            speakers: list[int]
-                list of speaker numbers for the speakers talking in the segment
-            start_time: float
-                start time of the segment in seconds
-            end_time: float
-                end time of the segment in seconds
-            first_face_sec: float
-                the first second in the segment with a face
-            found_face: bool
-                whether or not a face was found in the segment
+        segments: list[SegmentAnalysis]
+            The segments of the batch, with num_samples set by
+            `_calc_face_detect_secs`.
+        detect_secs: list[float]
+            The seconds sampled from each segment, as returned by
+            `_calc_face_detect_secs`.
+        frames: list[np.ndarray]
+            The frames at each of the sampled seconds.
         video_file: VideoFile
             The video file to analyze.
         resize_width: int
             The width to resize the video to.
         resize_height: int
             The height to resize the video to.
-        samples_per_segment: int
-            Number of samples to take per segment for analyzing face locations.
         face_detect_width: int
             Width to which the video frames are resized for face detection.
 
@@ -697,70 +1076,66 @@ class Resizer:
             y: int
                 y-coordinate of the top left corner of the resized segment
         """
-        fps = video_file.get_frame_rate()
-
-        # define frames to analyze from each segment
-        detect_secs = []
-        for segment in segments:
-            if segment["found_face"] is False:
-                continue
-            # define interval over which to analyze faces
-            end_time = segment["end_time"]
-            first_face_sec = segment["first_face_sec"]
-            analyze_end_time = end_time - (end_time - first_face_sec) / 8
-            # get sample locations
-            frames_left = int((analyze_end_time - first_face_sec) * fps + 1)
-            num_samples = min(frames_left, samples_per_segment)
-            segment["num_samples"] = num_samples
-            # add first face, sample the rest
-            detect_secs.append(first_face_sec)
-            sample_frames = np.sort(
-                np.random.choice(range(1, frames_left), num_samples - 1, replace=False)
-            )
-            for sample_frame in sample_frames:
-                detect_secs.append(first_face_sec + sample_frame / fps)
-
-        # detect faces from each segment
-        logging.debug("Extracting {} frames".format(len(detect_secs)))
-        frames = extract_frames(video_file, detect_secs)
-        logging.debug("Extracted {} frames".format(len(detect_secs)))
-        face_detections = self._detect_faces(frames, face_detect_width)
+        # detect faces from each segment, skipping frames with cached detections
+        cache_keys = self._calc_face_detection_cache_keys(
+            video_file, detect_secs, face_detect_width
+        )
+        face_detections, uncached_idxs = self._get_cached_face_detections(cache_keys)
+        uncached_detections = self._detect_faces(
+            [frames[i] for i in uncached_idxs], face_detect_width
+        )
+        for i, face_detection in zip(uncached_idxs, uncached_detections):
+            face_detections[i] = face_detection
+        self._cache_face_detections(
+            [cache_keys[i] for i in uncached_idxs], uncached_detections
+        )
 
         logging.debug("Calculating ROI for {} segments.".format(len(segments)))
         # find roi for each segment
+        segments_with_xy_coords = []
         idx = 0
         for segment in segments:
             # find segment roi
-            if segment["found_face"] is True:
+            if segment.found_face is True:
                 roi = self._calc_segment_roi(
-                    frames=frames[idx : idx + segment["num_samples"]],
-                    face_detections=face_detections[idx : idx + segment["num_samples"]],
+                    frames=frames[idx : idx + segment.num_samples],
+                    face_detections=face_detections[idx : idx + segment.num_samples],
+                    frame_keys=cache_keys[idx : idx + segment.num_samples],
                 )
-                idx += segment["num_samples"]
-                del segment["num_samples"]
+                idx += segment.num_samples
             else:
-                logging.debug("Using default ROI for segment {}".format(segment))
+                logging.debug(
+                    "Using default ROI for segment ({}s - {}s)".format(
+                        segment.start_time, segment.end_time
+                    )
+                )
                 roi = Rect(
                     x=(video_file.get_width_pixels()) // 4,
                     y=(video_file.get_height_pixels()) // 4,
                     width=(video_file.get_width_pixels()) // 2,
                     height=(video_file.get_height_pixels()) // 2,
                 )
-            del segment["found_face"]
-            del segment["first_face_sec"]
 
             # add crop coordinates to segment
             crop = self._calc_crop(roi, resize_width, resize_height)
-            segment["x"] = int(crop.x)
-            segment["y"] = int(crop.y)
+            segments_with_xy_coords.append(
+                {
+                    "speakers": segment.speakers,
+                    "start_time": segment.start_time,
+                    "end_time": segment.end_time,
+                    "x": int(crop.x),
+                    "y": int(crop.y),
+                }
+            )
         logging.debug("Calculated ROI for {} segments.".format(len(segments)))
 
-        return segments
+        return segments_with_xy_coords
 
     def _calc_segment_roi(
         self,
         frames: list[np.ndarray],
         face_detections: list[np.ndarray],
+        frame_keys: list[tuple],
     ) -> Rect:
         """
         Find the region of interest (ROI) for a given segment.
@@ -771,6 +1146,9 @@ class Resizer:
             The frames to analyze.
         face_detections: np.ndarray
             The face detection outputs for each frame
+        frame_keys: list[tuple]
+            The cache key of each frame, as returned by
+            `_calc_face_detection_cache_keys`.
 
         Returns
         -------
@@ -779,50 +1157,53 @@ class Resizer:
         """
         segment_roi = None
 
-        # preprocessing for kmeans
+        # collect the bounding boxes of every frame and the frame each one is from
         bounding_boxes: list[np.ndarray] = []
+        box_frame_idxs: list[int] = []
         k = 0
-        for face_detection in face_detections:
+        for i, face_detection in enumerate(face_detections):
             if face_detection is None:
                 continue
             k = max(k, len(face_detection))
             for bounding_box in face_detection:
                 bounding_boxes.append(bounding_box)
+            box_frame_idxs.extend([i] * len(face_detection))
 
         # no faces detected
         if k == 0:
             raise ResizerError("No faces detected in segment.")
         bounding_boxes = np.stack(bounding_boxes)
+        np.clip(bounding_boxes, 0, None, out=bounding_boxes)
 
         # single face detected
         if k == 1:
             box = np.mean(bounding_boxes, axis=0).astype(np.int16)
-            x1, y1, x2, y2 = box
+            x1, y1, x2, y2 = box.tolist()
             segment_roi = Rect(x1, y1, x2 - x1, y2 - y1)
             return segment_roi
 
-        # use kmeans to group the same bounding boxes together
-        kmeans = KMeans(n_clusters=k, init="k-means++", n_init=2, random_state=0).fit(
-            bounding_boxes
-        )
-        bounding_box_labels = kmeans.labels_
-        bounding_box_groups: list[list[dict]] = [[] for _ in range(k)]
-        kmeans_idx = 0
-        for i, face_detection in enumerate(face_detections):
-            if face_detection is None:
-                continue
-            for bounding_box in face_detection:
-                assert np.sum(bounding_box < 0) == 0
-                bounding_box_label = bounding_box_labels[kmeans_idx]
-                bounding_box_groups[bounding_box_label].append(
-                    {"bounding_box": bounding_box, "frame": i}
-                )
-                kmeans_idx += 1
+        # group the bounding boxes of the same face together
+        if k == 2:
+            n_groups, bounding_box_labels = self._split_bounding_boxes_in_two(
+                bounding_boxes
+            )
+        else:
+            n_groups, bounding_box_labels = self._group_bounding_boxes(bounding_boxes)
+        box_frame_idxs = np.array(box_frame_idxs)
+        group_masks = [bounding_box_labels == label for label in range(n_groups)]
 
         # find the face who's mouth moves the most
+        group_results = self._get_mouth_movement_executor().map(
+            lambda group_mask: self._calc_mouth_movement(
+                bounding_boxes[group_mask],
+                box_frame_idxs[group_mask],
+                frames,
+                frame_keys,
+            ),
+            group_masks,
+        )
         max_mouth_movement = 0
-        for bounding_box_group in bounding_box_groups:
-            mouth_movement, roi = self._calc_mouth_movement(bounding_box_group, frames)
+        for mouth_movement, roi in group_results:
             if mouth_movement > max_mouth_movement:
                 max_mouth_movement = mouth_movement
                 segment_roi = roi
@@ -830,28 +1211,97 @@ class Resizer:
         # no mouth movement detected -> choose face with the most frames
         if segment_roi is None:
             logging.debug("No mouth movement detected for segment.")
-            max_frames = 0
-            for bounding_box_group in bounding_box_groups:
-                if len(bounding_box_group) > max_frames:
-                    max_frames = len(bounding_box_group)
-                    avg_box = np.array([0, 0, 0, 0])
-                    for bounding_box_data in bounding_box_group:
-                        avg_box += bounding_box_data["bounding_box"]
-                    avg_box = avg_box / len(bounding_box_group)
-                    avg_box = avg_box.astype(np.int16)
-                    segment_roi = Rect(
-                        avg_box[0],
-                        avg_box[1],
-                        avg_box[2] - avg_box[0],
-                        avg_box[3] - avg_box[1],
-                    )
+            group_sizes = np.bincount(bounding_box_labels, minlength=n_groups)
+            group_mask = bounding_box_labels == np.argmax(group_sizes)
+            avg_box = bounding_boxes[group_mask].mean(axis=0).astype(np.int16)
+            avg_box = avg_box.tolist()
+            segment_roi = Rect(
+                avg_box[0],
+                avg_box[1],
+                avg_box[2] - avg_box[0],
+                avg_box[3] - avg_box[1],
+            )
 
         return segment_roi
 
+    def _group_bounding_boxes(
+        self,
+        bounding_boxes: np.ndarray,
+        iou_threshold: float = 0.5,
+    ) -> tuple[int, np.ndarray]:
+        """
+        Group the bounding boxes that belong to the same face. Two bounding boxes are
+        connected if their intersection over union (IoU) is at least `iou_threshold`,
+        and each connected component of bounding boxes is one face.
+
+        Parameters
+        ----------
+        bounding_boxes: np.ndarray
+            The bounding boxes to group, an array of shape (N, 4) where each row
+            contains the values [x1, y1, x2, y2].
+        iou_threshold: float
+            The minimum IoU for two bounding boxes to be considered the same face.
+
+        Returns
+        -------
+        tuple[int, np.ndarray]
+            The number of groups and the group label of each bounding box.
+        """
+        boxes = bounding_boxes.astype(np.float64)
+
+        # pairwise IoU of all bounding boxes
+        top_left = np.maximum(boxes[:, None, :2], boxes[None, :, :2])
+        bottom_right = np.minimum(boxes[:, None, 2:], boxes[None, :, 2:])
+        intersections = np.clip(bottom_right - top_left, 0, None).prod(axis=-1)
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        unions = areas[:, None] + areas[None, :] - intersections
+        ious = np.divide(
+            intersections,
+            unions,
+            out=np.zeros_like(intersections),
+            where=unions > 0,
+        )
+
+        n_groups, labels = connected_components(ious >= iou_threshold, directed=False)
+        return n_groups, labels
+
+    def _split_bounding_boxes_in_two(
+        self,
+        bounding_boxes: np.ndarray,
+    ) -> tuple[int, np.ndarray]:
+        """
+        Split the bounding boxes of frames with at most two faces into the two faces.
+        The bounding box centers are split at the largest gap along whichever axis
+        they are spread out the most.
+
+        Parameters
+        ----------
+        bounding_boxes: np.ndarray
+            The bounding boxes to split, an array of shape (N, 4) where each row
+            contains the values [x1, y1, x2, y2].
+
+        Returns
+        -------
+        tuple[int, np.ndarray]
+            The number of groups and the group label of each bounding box.
+        """
+        centers = (bounding_boxes[:, :2] + bounding_boxes[:, 2:]) / 2
+        axis = np.argmax(np.ptp(centers, axis=0))
+        sorted_centers = np.sort(centers[:, axis])
+        gaps = np.diff(sorted_centers)
+        split_idx = np.argmax(gaps)
+        # every bounding box is in the same place -> only one face
+        if gaps[split_idx] == 0:
+            return 1, np.zeros(len(bounding_boxes), dtype=np.int32)
+        threshold = (sorted_centers[split_idx] + sorted_centers[split_idx + 1]) / 2
+        return 2, (centers[:, axis] > threshold).astype(np.int32)
+
     def _calc_mouth_movement(
         self,
-        bounding_box_group: list[dict[np.ndarray, int]],
+        bounding_boxes: np.ndarray,
+        frame_idxs: np.ndarray,
         frames: list[np.ndarray],
+        frame_keys: list[tuple],
     ) -> tuple[float, Rect]:
         """
         Calculates the mouth movement for a group of faces. These faces are assumed to
@@ -860,46 +1310,95 @@ class Resizer:
 
         Parameters
         ----------
-        bounding_box_group: list[dict[np.ndarray, int]]
-            The faces to analyze. A list of dictionaries, each with the following keys:
-                bounding_box: np.ndarray
-                    The bounding box of the face to analyze. The array contains four
-                    values: [x1, y1, x2, y2]
-                frame: int
-                    The frame the bounding box of the face is associated with.
+        bounding_boxes: np.ndarray
+            The bounding boxes of the faces to analyze, an array of shape (N, 4) where
+            each row contains the values [x1, y1, x2, y2].
+        frame_idxs: np.ndarray
+            The index of the frame each bounding box is from, an array of shape (N,).
         frames: list[np.ndarray]
             The frames to analyze.
+        frame_keys: list[tuple]
+            The cache key of each frame, as returned by
+            `_calc_face_detection_cache_keys`.
 
         Returns
         -------
         float
             The mouth movement of the faces across the frames.
         """
-        mouth_movement = 0
-        roi = Rect(0, 0, 0, 0)
-        prev_mar = None
-        mouth_movement = 0
-
-        for bounding_box_data in bounding_box_group:
-            # roi
-            box = bounding_box_data["bounding_box"]
-            x1, y1, x2, y2 = box[0], box[1], box[2], box[3]
-            # sum all roi's, average after loop
-            roi += Rect(x1, y1, x2 - x1, y2 - y1)
-            frame = frames[bounding_box_data["frame"]]
-            face = frame[y1:y2, x1:x2, :]
-
-            # mouth movement
-            mar = self._calc_mouth_aspect_ratio(face)
-            if mar is None:
-                continue
-            if prev_mar is None:
-                prev_mar = mar
-                continue
-            mouth_movement += abs(mar - prev_mar)
-            prev_mar = mar
+        # roi is the average (x, y, width, height) of all the bounding boxes
+        boxes = bounding_boxes.astype(np.int64)
+        roi_sums = np.concatenate(
+            [boxes[:, :2].sum(axis=0), (boxes[:, 2:] - boxes[:, :2]).sum(axis=0)]
+        )
+        roi = Rect(*(roi_sums // len(bounding_boxes)).tolist())
+
+        # the face mesher of this thread is reset before it meshes the first face of
+        # the group, if any face of the group needs a mesh at all
+        self._face_mesher_local.new_group = True
+
+        mars = []
+        for bounding_box, frame_idx in zip(bounding_boxes, frame_idxs.tolist()):
+            mar = self._get_mouth_aspect_ratio(
+                frames[frame_idx], bounding_box, frame_keys[frame_idx]
+            )
+            if mar is not None:
+                mars.append(mar)
+
+        # mouth movement is the total change in mar between consecutive faces
+        if len(mars) > 1:
+            mouth_movement = float(np.abs(np.diff(mars)).sum())
+        else:
+            mouth_movement = 0
 
-        return mouth_movement, roi / len(bounding_box_group)
+        return mouth_movement, roi
+
+    def _get_mouth_aspect_ratio(
+        self,
+        frame: np.ndarray,
+        bounding_box: np.ndarray,
+        frame_key: tuple,
+    ) -> float:
+        """
+        Get the mouth aspect ratio of a face, reusing the cached value if the face
+        was already analyzed.
+
+        Parameters
+        ----------
+        frame: np.ndarray
+            The frame the face is in.
+        bounding_box: np.ndarray
+            The bounding box of the face. The array contains four values:
+            [x1, y1, x2, y2]
+        frame_key: tuple
+            The cache key of the frame, as returned by
+            `_calc_face_detection_cache_keys`.
+
+        Returns
+        -------
+        mar: float
+            The mouth aspect ratio. None if no face mesh was found or the face is
+            too small.
+        """
+        # the lips of smaller faces are a pixel or two apart, too coarse to measure
+        x1, y1, x2, y2 = bounding_box
+        if x2 - x1 < MIN_MOUTH_FACE_SIZE or y2 - y1 < MIN_MOUTH_FACE_SIZE:
+            return None
+
+        cache_key = (frame_key, *bounding_box.tolist())
+        with self._mouth_aspect_ratio_cache_lock:
+            if cache_key in self._mouth_aspect_ratio_cache:
+                self._mouth_aspect_ratio_cache.move_to_end(cache_key)
+                return self._mouth_aspect_ratio_cache[cache_key]
+
+        # media pipe takes a tightly packed copy much faster than a strided view
+        face = np.ascontiguousarray(frame[y1:y2, x1:x2, :])
+        mar = self._calc_mouth_aspect_ratio(face)
+        with self._mouth_aspect_ratio_cache_lock:
+            self._mouth_aspect_ratio_cache[cache_key] = mar
+            if len(self._mouth_aspect_ratio_cache) > MOUTH_ASPECT_RATIO_CACHE_SIZE:
+                self._mouth_aspect_ratio_cache.popitem(last=False)
+        return mar
 
     def _calc_mouth_aspect_ratio(self, face: np.ndarray) -> float:
         """
@@ -915,26 +1414,90 @@ class Resizer:
         mar: float
             The mouth aspect ratio.
         """
-        results = self._face_mesher.process(face)
+        results = self._get_face_mesher().process(face)
         if results.multi_face_landmarks is None:
             return None
 
-        landmarks = []
-        for landmark in results.multi_face_landmarks[0].landmark:
-            landmarks.append([landmark.x, landmark.y])
-        landmarks = np.array(landmarks)
-        landmarks[:, 0] *= face.shape[1]
-        landmarks[:, 1] *= face.shape[0]
+        # only read the few landmarks around the mouth out of the 468 in the mesh
+        face_landmarks = results.multi_face_landmarks[0].landmark
+        landmarks = np.fromiter(
+            chain.from_iterable(
+                (face_landmarks[i].x, face_landmarks[i].y) for i in MOUTH_LANDMARKS
+            ),
+            dtype=np.float32,
+            count=2 * len(MOUTH_LANDMARKS),
+        ).reshape(-1, 2)
+        # normalized (x, y) coordinates to pixels
+        landmarks *= (face.shape[1], face.shape[0])
+        upper_lip, lower_lip, mouth_corners = np.split(
+            landmarks, [len(UPPER_LIP_LANDMARKS), 2 * len(UPPER_LIP_LANDMARKS)]
+        )
 
-        # inner lip
-        upper_lip = landmarks[[95, 88, 178, 87, 14, 317, 402, 318, 324], :]
-        lower_lip = landmarks[[191, 80, 81, 82, 13, 312, 311, 310, 415], :]
-        avg_mouth_height = np.mean(np.abs(upper_lip - lower_lip))
-        mouth_width = np.sum(np.abs(landmarks[[308], :] - landmarks[[78], :]))
-        mar = avg_mouth_height / mouth_width
+        # inner lip, the abs reuses the buffer of the difference
+        lip_gaps = upper_lip - lower_lip
+        avg_mouth_height = np.abs(lip_gaps, out=lip_gaps).mean()
+        mouth_width = np.abs(mouth_corners[0] - mouth_corners[1]).sum()
+        mar = float(avg_mouth_height / mouth_width)
 
         return mar
 
+    def _get_face_mesher(self) -> mp.solutions.face_mesh.FaceMesh:
+        """
+        Get the MediaPipe face mesher of the current thread, creating it on the first
+        call from the thread. An existing face mesher is reset on the first call of a
+        new group of faces.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        mp.solutions.face_mesh.FaceMesh
+            The face mesher.
+        """
+        face_mesher = getattr(self._face_mesher_local, "face_mesher", None)
+        if face_mesher is None:
+            # media pipe automatically uses gpu if available. The faces of a group are
+            # tracked from frame to frame instead of detected in every crop, and only
+            # the basic mesh is needed for the lip landmarks
+            face_mesher = mp.solutions.face_mesh.FaceMesh(
+                static_image_mode=False,
+                max_num_faces=1,
+                refine_landmarks=False,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
+            self._face_mesher_local.face_mesher = face_mesher
+            with self._face_meshers_lock:
+                self._face_meshers.append(face_mesher)
+        elif getattr(self._face_mesher_local, "new_group", False):
+            # don't track the face of the previous group analyzed by this thread
+            face_mesher.reset()
+        self._face_mesher_local.new_group = False
+        return face_mesher
+
+    def _get_mouth_movement_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the thread pool that calculates the mouth movement of the faces in a
+        segment in parallel, creating it on the first call. The pool is kept for the
+        lifetime of the Resizer so that its threads keep their face meshers.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        ThreadPoolExecutor
+            The thread pool.
+        """
+        if self._mouth_movement_executor is None:
+            self._mouth_movement_executor = ThreadPoolExecutor(
+                max_workers=MOUTH_MOVEMENT_WORKERS
+            )
+        return self._mouth_movement_executor
+
     def _calc_crop(
         self,
         roi: Rect,
@@ -954,11 +1517,12 @@ class Resizer:
         Rect
             The crop rectangle.
         """
-        roi_x_center = roi.x + roi.width // 2
-        roi_y_center = roi.y + roi.height // 2
+        # all the coordinates are integers, halve them with shifts
+        roi_x_center = roi.x + (roi.width >> 1)
+        roi_y_center = roi.y + (roi.height >> 1)
         crop = Rect(
-            x=max(roi_x_center - (resize_width // 2), 0),
-            y=max(roi_y_center - (resize_height // 2), 0),
+            x=max(roi_x_center - (resize_width >> 1), 0),
+            y=max(roi_y_center - (resize_height >> 1), 0),
             width=resize_width,
             height=resize_height,
         )
@@ -993,42 +1557,63 @@ class Resizer:
         list[dict]
             The merged segments.
         """
-        idx = 0
+        if len(segments) == 0:
+            return segments
+
         max_position_difference_ratio = 0.04
-        video_width = video_file.get_width_pixels()
-        video_height = video_file.get_height_pixels()
-
-        for _ in range(len(segments) - 1):
-            cur_x = segments[idx]["x"]
-            next_x = segments[idx + 1]["x"]
-            x_diff = abs(cur_x - next_x)
-            if (x_diff / video_width) < max_position_difference_ratio:
-                same_x = True
-                segments[idx]["x"] = int((cur_x + next_x) // 2)
-            else:
-                same_x = False
-
-            curr_y = segments[idx]["y"]
-            next_y = segments[idx + 1]["y"]
-            y_diff = abs(curr_y - next_y)
-            if (y_diff / video_height) < max_position_difference_ratio:
-                same_y = True
-                segments[idx]["y"] = int((curr_y + next_y) // 2)
-            else:
-                same_y = False
+        # compare pixel differences against pixel thresholds rather than dividing
+        # each difference by the frame size
+        max_x_difference = max_position_difference_ratio * video_file.get_width_pixels()
+        max_y_difference = (
+            max_position_difference_ratio * video_file.get_height_pixels()
+        )
+
+        # each segment is either merged into the last kept segment or kept itself.
+        # The position of the last kept segment is tracked in locals and only
+        # written back once no more segments are merged into it
+        merged_segments = []
+        segment = segments[0]
+        x, y = segment["x"], segment["y"]
+        for next_segment in segments[1:]:
+            next_x, next_y = next_segment["x"], next_segment["y"]
+            same_x = abs(x - next_x) < max_x_difference
+            if same_x:
+                x = int((x + next_x) // 2)
+            same_y = abs(y - next_y) < max_y_difference
+            if same_y:
+                y = int((y + next_y) // 2)
 
             if same_x and same_y:
-                segments[idx]["end_time"] = segments[idx + 1]["end_time"]
-                segments = segments[: idx + 1] + segments[idx + 2 :]
+                segment["end_time"] = next_segment["end_time"]
             else:
-                idx += 1
-        return segments
+                segment["x"], segment["y"] = x, y
+                merged_segments.append(segment)
+                segment = next_segment
+                x, y = next_x, next_y
+        segment["x"], segment["y"] = x, y
+        merged_segments.append(segment)
+        return merged_segments
 
     def cleanup(self) -> None:
         """
-        Remove the face detector from memory and explicity free up GPU memory.
+        Remove the face detector and face meshers from memory and explicity free up
+        GPU memory.
         """
         del self._face_detector
         self._face_detector = None
+        del self._fast_face_detector
+        self._fast_face_detector = None
+        self._pinned_frame_buffer = None
+        if self._mouth_movement_executor is not None:
+            self._mouth_movement_executor.shutdown()
+            self._mouth_movement_executor = None
+        for face_mesher in self._face_meshers:
+            face_mesher.close()
+        self._face_meshers = []
+        self._face_mesher_local = threading.local()
+        # drop the python references before the cached GPU memory is released
+        gc.collect()
         if torch.cuda.is_available():
+            # wait for pending kernels so the memory they use can be released
+            torch.cuda.synchronize()
             torch.cuda.empty_cache()
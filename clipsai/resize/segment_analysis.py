@@ -0,0 +1,57 @@
+"""
+A class to hold the state of a segment while its faces are analyzed for resizing.
+"""
+
+
+class SegmentAnalysis:
+    """
+    Represents a speaker segment while the Resizer searches it for faces and samples
+    its frames to find the region of interest.
+
+    Attributes
+    ----------
+        speakers (list[int]): List of speaker IDs present in the segment.
+        start_time (float): Start time of the segment in seconds.
+        end_time (float): End time of the segment in seconds.
+        first_face_sec (float): The first second in the segment with a face.
+        found_face (bool): Whether or not a face was found in the segment.
+        is_analyzed (bool): Whether or not the search for a face has finished.
+        num_samples (int): The number of frames sampled from the segment.
+    """
+
+    __slots__ = (
+        "speakers",
+        "start_time",
+        "end_time",
+        "first_face_sec",
+        "found_face",
+        "is_analyzed",
+        "num_samples",
+    )
+
+    def __init__(
+        self,
+        speakers: list[int],
+        start_time: float,
+        end_time: float,
+    ) -> None:
+        """
+        Initializes a SegmentAnalysis instance. The search for a face starts an
+        eighth of the way through the segment.
+
+        Parameters
+        ----------
+        speakers: list[int]
+            List of speaker IDs present in the segment.
+        start_time: float
+            Start time of the segment in seconds.
+        end_time: float
+            End time of the segment in seconds.
+        """
+        self.speakers = speakers
+        self.start_time = start_time
+        self.end_time = end_time
+        self.first_face_sec = start_time + (end_time - start_time) / 8
+        self.found_face = False
+        self.is_analyzed = False
+        self.num_samples = 0
@@ -2,6 +2,7 @@
 Utilities for video processing.
 """
 # standard library imports
+from collections.abc import Iterator
 from concurrent.futures import ThreadPoolExecutor
 import logging
 
@@ -18,6 +19,10 @@ import cv2
 import numpy as np
 from scenedetect import detect, AdaptiveDetector
 
+# decode forward instead of seeking when the next frame is at most this many seconds
+# ahead of the current decode position
+MAX_DECODE_AHEAD_SECS = 2
+
 
 def extract_frames(
     video_file: VideoFile,
@@ -59,17 +64,34 @@ def extract_frames(
     extract_times_pts = [
         int(extract_sec / stream.time_base) for extract_sec in extract_secs
     ]
-    frames_to_process = []
-    for extract_pts in extract_times_pts:
-        # Seek to the nearest keyframe to our desired timestamp
-        container.seek(extract_pts, stream=stream)
-        prev_frame = None
-        for frame in container.decode(stream):
-            if frame.pts > extract_pts:
-                frames_to_process.append(prev_frame or frame)
-                break
-            prev_frame = frame
-    assert len(frames_to_process) == len(extract_secs)
+    max_decode_ahead_pts = int(MAX_DECODE_AHEAD_SECS / stream.time_base)
+
+    # visit the timestamps in order so nearby frames are decoded in a single pass
+    # rather than seeking back to the same keyframe for each of them
+    frames_to_process = [None] * len(extract_times_pts)
+    decoded_frames = None
+    prev_frame = None
+    next_frame = None
+    extract_order = sorted(
+        range(len(extract_times_pts)), key=extract_times_pts.__getitem__
+    )
+    for idx in extract_order:
+        extract_pts = extract_times_pts[idx]
+        if next_frame is None or extract_pts - next_frame.pts > max_decode_ahead_pts:
+            # Seek to the nearest keyframe to our desired timestamp
+            container.seek(extract_pts, stream=stream)
+            decoded_frames = container.decode(stream)
+            prev_frame = None
+            next_frame = next(decoded_frames, None)
+        # decode forward until passing the desired timestamp
+        while next_frame is not None and next_frame.pts <= extract_pts:
+            prev_frame = next_frame
+            next_frame = next(decoded_frames, None)
+        if next_frame is None:
+            break
+        frames_to_process[idx] = prev_frame or next_frame
+    container.close()
+    assert all(frame is not None for frame in frames_to_process)
 
     # define function for parallel processing
     def process_frame(frame):
@@ -95,6 +117,57 @@ def extract_frames(
     return processed_frames
 
 
+def extract_frames_in_batches(
+    video_file: VideoFile,
+    extract_secs_batches: list[list[float]],
+    grayscale: bool = False,
+    downsample_factor: float = 1,
+) -> Iterator[list[np.ndarray]]:
+    """
+    Extract frames from a video one batch at a time. The next batch is extracted in a
+    background thread while the caller processes the current one, so at most two
+    batches of frames are held in memory at once.
+
+    Parameters
+    ----------
+    video_file: VideoFile
+        The video file to extract frames from.
+    extract_secs_batches: list[list[float]]
+        The seconds to extract frames from, grouped into batches.
+    grayscale: bool
+        Whether to convert the frames to grayscale.
+    downsample_factor: float
+        The factor to downsample the frames by.
+
+    Yields
+    ------
+    list[np.array]
+        The extracted frames of each batch as numpy arrays
+    """
+    if len(extract_secs_batches) == 0:
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        next_batch = executor.submit(
+            extract_frames,
+            video_file,
+            extract_secs_batches[0],
+            grayscale,
+            downsample_factor,
+        )
+        for i in range(1, len(extract_secs_batches) + 1):
+            frames = next_batch.result()
+            if i < len(extract_secs_batches):
+                next_batch = executor.submit(
+                    extract_frames,
+                    video_file,
+                    extract_secs_batches[i],
+                    grayscale,
+                    downsample_factor,
+                )
+            yield frames
+
+
 def detect_scenes(
     video_file: VideoFile,
     min_scene_duration: float = 0.25,
@@ -318,3 +318,22 @@ def get_free_cpu_memory() -> int:
         The free CPU memory in bytes.
     """
     return psutil.virtual_memory().available
+
+
+def get_free_gpu_memory() -> int:
+    """
+    Returns the free memory of the current CUDA device in bytes.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    free_memory: int
+        The free GPU memory in bytes. 0 if CUDA isn't available.
+    """
+    if torch.cuda.is_available() is False:
+        return 0
+    free_memory, _ = torch.cuda.mem_get_info()
+    return free_memory
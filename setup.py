@@ -31,7 +31,6 @@ setup(
         "pytest",
         "python-magic",
         "scenedetect",
-        "scikit-learn",
         "sentence-transformers",
         "scipy",
         "torch",
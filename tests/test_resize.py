@@ -1,13 +1,16 @@
 # standard library imports
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 # local package imports
 from clipsai.media.video_file import VideoFile
-from clipsai.resize.resizer import Resizer
+from clipsai.resize.resizer import MIN_MOUTH_FACE_SIZE, Resizer
 from clipsai.resize.rect import Rect
+from clipsai.resize.segment_analysis import SegmentAnalysis
 
 
 # third party imports
+import numpy as np
 import pytest
 
 
@@ -140,18 +143,20 @@ def test_merge_scene_change_and_speaker_segments(
 
 @pytest.mark.parametrize(
     (
-        "width, height, num_frames, gpu_available, face_detect_width,"
-        "n_face_detect_batches, expected_batches"
+        "width, height, num_frames, gpu_available, free_gpu_memory,"
+        "face_detect_width, n_face_detect_batches, expected_batches"
     ),
     [
         # Scenario 1: CPU only, small video
-        (640, 480, 100, False, 960, 8, 1),
+        (640, 480, 100, False, 8000000000, 960, 8, 1),
         # Scenario 2: CPU only, large video
-        (1920, 1080, 100, False, 960, 8, 1),
+        (1920, 1080, 100, False, 8000000000, 960, 8, 1),
         # Scenario 3: GPU available, small video
-        (640, 480, 100, True, 960, 8, 8),
+        (640, 480, 100, True, 8000000000, 960, 8, 8),
         # Scenario 4: GPU available, large video
-        (1920, 1080, 100, True, 960, 8, 8),
+        (1920, 1080, 100, True, 8000000000, 960, 8, 8),
+        # Scenario 5: GPU available, face detection doesn't fit in free GPU memory
+        (1920, 1080, 100, True, 250000000, 960, 8, 16),
     ],
 )
 def test_calc_n_batches(
@@ -159,6 +164,7 @@ def test_calc_n_batches(
     height: int,
     num_frames: int,
     gpu_available: bool,
+    free_gpu_memory: int,
     face_detect_width: int,
     n_face_detect_batches: int,
     expected_batches: int,
@@ -170,9 +176,11 @@ def test_calc_n_batches(
 
     resizer = Resizer()
 
-    # Mock pytorch.get_free_cpu_memory ~7.5 GiB
+    # Mock pytorch.get_free_cpu_memory ~7.5 GiB and pytorch.get_free_gpu_memory
     with patch("torch.cuda.is_available", return_value=gpu_available), patch(
         "utils.pytorch.get_free_cpu_memory", return_value=8000000000
+    ), patch(
+        "clipsai.utils.pytorch.get_free_gpu_memory", return_value=free_gpu_memory
     ):
         n_batches = resizer._calc_n_batches(
             video_file=mock_video_file,
@@ -184,6 +192,82 @@ def test_calc_n_batches(
         assert n_batches == expected_batches
 
 
+def test_face_detection_cache():
+    resizer = Resizer()
+    detections = {
+        key: np.array([[i, i, i + 10, i + 10]]) for i, key in enumerate("abcd")
+    }
+
+    with patch("clipsai.resize.resizer.FACE_DETECTION_CACHE_SIZE", 3):
+        resizer._cache_face_detections(["a", "b", "c"], [detections[k] for k in "abc"])
+
+        # cached frames are returned in order, uncached frames by index
+        face_detections, uncached_idxs = resizer._get_cached_face_detections(
+            ["a", "d", "b"]
+        )
+        assert face_detections[0] is detections["a"]
+        assert face_detections[1] is None
+        assert face_detections[2] is detections["b"]
+        assert uncached_idxs == [1]
+
+        # "c" is now the least recently used and is evicted first
+        resizer._cache_face_detections(["d"], [detections["d"]])
+        face_detections, uncached_idxs = resizer._get_cached_face_detections(
+            ["c", "d", "a", "b"]
+        )
+        assert face_detections[0] is None
+        assert face_detections[1] is detections["d"]
+        assert uncached_idxs == [0]
+        assert len(resizer._face_detection_cache) == 3
+
+
+@pytest.mark.parametrize(
+    (
+        "start_time, end_time, fps, found_face, samples_per_segment,"
+        "expected_num_samples, expected_analyze_end_time"
+    ),
+    [
+        # Test case 1: Long segment, sample count capped by samples_per_segment
+        (0, 8, 30, True, 13, 13, 7.125),
+        # Test case 2: Short segment, sample count capped by the frames left
+        (0, 0.08, 30, True, 13, 2, 0.07125),
+        # Test case 3: Single sample per segment
+        (0, 8, 30, True, 1, 1, 7.125),
+        # Test case 4: Single frame left to sample
+        (0, 0.01, 30, True, 13, 1, 0.00890625),
+        # Test case 5: Segment without a face isn't sampled
+        (0, 8, 30, False, 13, 0, None),
+    ],
+)
+def test_calc_face_detect_secs(
+    start_time: float,
+    end_time: float,
+    fps: float,
+    found_face: bool,
+    samples_per_segment: int,
+    expected_num_samples: int,
+    expected_analyze_end_time: float,
+):
+    mock_video_file = MagicMock(spec=VideoFile)
+    mock_video_file.get_frame_rate.return_value = fps
+    segment = SegmentAnalysis(speakers=[0], start_time=start_time, end_time=end_time)
+    segment.found_face = found_face
+
+    resizer = Resizer()
+    detect_secs = resizer._calc_face_detect_secs(
+        [segment], mock_video_file, samples_per_segment
+    )
+
+    assert segment.num_samples == expected_num_samples
+    assert len(detect_secs) == expected_num_samples
+    if expected_num_samples > 0:
+        # the first face is sampled first, the rest are distinct and increasing
+        # samples inside the analyze window
+        assert detect_secs[0] == segment.first_face_sec
+        assert all(a < b for a, b in zip(detect_secs, detect_secs[1:]))
+        assert detect_secs[-1] <= expected_analyze_end_time + 1e-9
+
+
 @pytest.mark.parametrize(
     "roi, resize_width, resize_height, expected_crop",
     [
@@ -203,6 +287,89 @@ def test_calc_crop(roi, resize_width, resize_height, expected_crop):
     assert actual_crop == expected_crop
 
 
+@pytest.mark.parametrize(
+    "bounding_boxes, expected_n_groups, expected_labels",
+    [
+        # Test case 1: Single bounding box
+        ([[0, 0, 10, 10]], 1, [0]),
+        # Test case 2: Same face across frames
+        ([[0, 0, 10, 10], [1, 1, 11, 11], [0, 1, 10, 11]], 1, [0, 0, 0]),
+        # Test case 3: Two faces across frames
+        (
+            [[0, 0, 10, 10], [100, 0, 110, 10], [1, 0, 11, 10], [101, 0, 111, 10]],
+            2,
+            [0, 1, 0, 1],
+        ),
+        # Test case 4: Slightly overlapping faces are kept apart
+        ([[0, 0, 10, 10], [8, 0, 18, 10]], 2, [0, 1]),
+    ],
+)
+def test_group_bounding_boxes(bounding_boxes, expected_n_groups, expected_labels):
+    resizer = Resizer()
+    n_groups, labels = resizer._group_bounding_boxes(
+        np.array(bounding_boxes, dtype=np.int16)
+    )
+    assert n_groups == expected_n_groups
+    assert labels.tolist() == expected_labels
+
+
+@pytest.mark.parametrize(
+    "bounding_boxes, expected_n_groups, expected_labels",
+    [
+        # Test case 1: Two faces side by side
+        (
+            [[0, 0, 10, 10], [100, 0, 110, 10], [2, 0, 12, 10], [99, 1, 109, 11]],
+            2,
+            [0, 1, 0, 1],
+        ),
+        # Test case 2: Two faces stacked vertically
+        ([[0, 100, 10, 110], [0, 0, 10, 10], [1, 2, 11, 12]], 2, [1, 0, 0]),
+        # Test case 3: One face every frame and a stray detection
+        (
+            [[0, 0, 10, 10], [1, 0, 11, 10], [2, 0, 12, 10], [60, 0, 70, 10]],
+            2,
+            [0, 0, 0, 1],
+        ),
+        # Test case 4: Identical bounding boxes
+        ([[0, 0, 10, 10], [0, 0, 10, 10]], 1, [0, 0]),
+    ],
+)
+def test_split_bounding_boxes_in_two(
+    bounding_boxes, expected_n_groups, expected_labels
+):
+    resizer = Resizer()
+    n_groups, labels = resizer._split_bounding_boxes_in_two(
+        np.array(bounding_boxes, dtype=np.int16)
+    )
+    assert n_groups == expected_n_groups
+    assert labels.tolist() == expected_labels
+
+
+def test_get_mouth_aspect_ratio():
+    landmarks = [SimpleNamespace(x=i / 468, y=(i % 13) / 13) for i in range(468)]
+    face_mesher = MagicMock()
+    face_mesher.process.return_value = SimpleNamespace(
+        multi_face_landmarks=[SimpleNamespace(landmark=landmarks)]
+    )
+    resizer = Resizer()
+    resizer._face_mesher_local.face_mesher = face_mesher
+    frame = np.zeros((200, 200, 3), dtype=np.uint8)
+    bounding_box = np.array([10, 10, 110, 110], dtype=np.int16)
+
+    mar = resizer._get_mouth_aspect_ratio(frame, bounding_box, "frame")
+    assert mar is not None
+    assert face_mesher.process.call_count == 1
+
+    # the same face in the same frame is a cache hit
+    assert resizer._get_mouth_aspect_ratio(frame, bounding_box, "frame") == mar
+    assert face_mesher.process.call_count == 1
+
+    # faces too small to measure aren't meshed
+    small_box = np.array([10, 10, 10 + MIN_MOUTH_FACE_SIZE - 1, 110], dtype=np.int16)
+    assert resizer._get_mouth_aspect_ratio(frame, small_box, "frame") is None
+    assert face_mesher.process.call_count == 1
+
+
 @pytest.mark.parametrize(
     "segments, expected",
     [
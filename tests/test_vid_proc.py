@@ -0,0 +1,116 @@
+# standard library imports
+from unittest.mock import MagicMock
+
+# local package imports
+from clipsai.media.video_file import VideoFile
+from clipsai.resize.vid_proc import extract_frames, extract_frames_in_batches
+
+# third party imports
+import av
+import numpy as np
+import pytest
+
+FPS = 10
+NUM_FRAMES = 60
+
+
+@pytest.fixture
+def video_file(tmp_path) -> VideoFile:
+    """
+    A 6 second clip where every frame has a different shade of gray and a keyframe
+    every second.
+    """
+    path = str(tmp_path / "clip.mp4")
+    container = av.open(path, "w")
+    stream = container.add_stream("libx264", rate=FPS)
+    stream.width = 64
+    stream.height = 48
+    stream.pix_fmt = "yuv420p"
+    stream.gop_size = FPS
+    for i in range(NUM_FRAMES):
+        img = np.full((48, 64, 3), i * 4, dtype=np.uint8)
+        frame = av.VideoFrame.from_ndarray(img, format="rgb24")
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+
+    mock_video_file = MagicMock(spec=VideoFile)
+    mock_video_file.path = path
+    mock_video_file.get_duration.return_value = NUM_FRAMES / FPS
+    return mock_video_file
+
+
+def extract_frame_by_seeking(path: str, extract_sec: float) -> np.ndarray:
+    """
+    Extract a single frame by seeking to it, as extract_frames did for every frame.
+    """
+    with av.open(path) as container:
+        stream = container.streams.video[0]
+        extract_pts = int(extract_sec / stream.time_base)
+        container.seek(extract_pts, stream=stream)
+        prev_frame = None
+        for frame in container.decode(stream):
+            if frame.pts > extract_pts:
+                return np.array((prev_frame or frame).to_image())
+            prev_frame = frame
+
+
+@pytest.mark.parametrize(
+    "extract_secs",
+    [
+        # Test case 1: Sorted seconds within the decode ahead limit
+        [0, 0.5, 1.0, 1.5],
+        # Test case 2: Unsorted seconds
+        [3.0, 0.2, 1.7, 0.9],
+        # Test case 3: Duplicate seconds
+        [1.0, 1.0, 2.5, 1.0],
+        # Test case 4: Gaps larger than the decode ahead limit
+        [0.1, 4.5, 2.2, 5.8],
+        # Test case 5: Near the end of the video and back to the start
+        [5.85, 0],
+        # Test case 6: No seconds
+        [],
+    ],
+)
+def test_extract_frames(video_file: VideoFile, extract_secs: list[float]):
+    frames = extract_frames(video_file, extract_secs)
+
+    assert len(frames) == len(extract_secs)
+    for frame, extract_sec in zip(frames, extract_secs):
+        expected = extract_frame_by_seeking(video_file.path, extract_sec)
+        assert np.array_equal(frame, expected)
+
+
+def test_extract_frames_past_last_frame(video_file: VideoFile):
+    # within the video's duration but after the start of its last frame
+    with pytest.raises(AssertionError):
+        extract_frames(video_file, [1.0, 5.95])
+
+
+@pytest.mark.parametrize(
+    "extract_secs_batches",
+    [
+        # Test case 1: Several batches, including an empty one
+        [[0.5, 0.1], [], [3.0], [1.0, 1.0, 5.5]],
+        # Test case 2: Single batch
+        [[2.0, 4.0]],
+        # Test case 3: No batches
+        [],
+    ],
+)
+def test_extract_frames_in_batches(
+    video_file: VideoFile, extract_secs_batches: list[list[float]]
+):
+    batches = list(
+        extract_frames_in_batches(
+            video_file, extract_secs_batches, downsample_factor=2
+        )
+    )
+
+    assert len(batches) == len(extract_secs_batches)
+    for frames, extract_secs in zip(batches, extract_secs_batches):
+        expected = extract_frames(video_file, extract_secs, downsample_factor=2)
+        assert len(frames) == len(expected)
+        assert all(np.array_equal(a, b) for a, b in zip(frames, expected))